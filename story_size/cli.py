@@ -1,6 +1,8 @@
 import typer
 import asyncio
+import logging
 import os
+from enum import Enum
 from pathlib import Path
 from typing import List, Optional
 from dotenv import load_dotenv
@@ -9,6 +11,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from story_size.config import load_config
+from story_size.logging_setup import setup_logging
 from story_size.core.docs_enhanced import read_documents_with_images
 from story_size.core.code_analysis import analyze_all_platforms
 from story_size.core.directory_resolver import DirectoryResolver
@@ -18,6 +21,18 @@ from story_size.core.hours_estimation import NonLinearEstimator
 
 app = typer.Typer()
 
+class LogLevel(str, Enum):
+    """Accepted values for --log-level"""
+    DEBUG = "debug"
+    INFO = "info"
+    WARNING = "warning"
+
+_LOG_LEVELS = {
+    LogLevel.DEBUG: logging.DEBUG,
+    LogLevel.INFO: logging.INFO,
+    LogLevel.WARNING: logging.WARNING,
+}
+
 @app.command()
 def main(
     # Document Input
@@ -50,6 +65,7 @@ def main(
     save_to_docs: bool = typer.Option(False, "--save-to-docs", help="Save output to markdown file in docs directory with generated filename."),
     auto_save: bool = typer.Option(False, "--auto-save/--no-auto-save", help="Auto-save to output_dir with generated filename.", envvar="DEFAULT_AUTO_SAVE"),
     config: Optional[Path] = typer.Option(None, "--config", help="Configuration file."),
+    log_level: LogLevel = typer.Option(LogLevel.INFO, "--log-level", case_sensitive=False, help="Logging verbosity: debug, info, warning. Use debug for impact and calculation details."),
 ):
     """
     Estimates story points with platform-specific analysis.
@@ -99,6 +115,8 @@ def main(
         print(f"Error: --docs-dir '{docs_dir}' is not a directory.")
         raise typer.Exit(code=1)
 
+    setup_logging(_LOG_LEVELS[log_level])
+
     # Load configuration
     config_data = load_config(config)
 
@@ -233,14 +251,14 @@ async def _run_platform_analysis(doc_text: str, platform_dirs, paths: Optional[L
         code_dir = platform_dirs.devops_dir
 
     # Run platform-aware AI analysis with auto-detected context
-    ai_client = PlatformAwareAIClient(config_data)
-    analysis = await ai_client.get_complete_analysis(
-        doc_text,
-        code_analysis,
-        force_platforms,
-        image_analysis,
-        code_dir  # Pass code_dir for auto context detection
-    )
+    async with PlatformAwareAIClient(config_data) as ai_client:
+        analysis = await ai_client.get_complete_analysis(
+            doc_text,
+            code_analysis,
+            force_platforms,
+            image_analysis,
+            code_dir  # Pass code_dir for auto context detection
+        )
 
     return (analysis, show_all_estimates)
 
@@ -7,6 +7,12 @@ DEFAULT_CONFIG = {
         "endpoint": "https://api.z.ai/api/anthropic/v1/messages",
         "api_key_env": "ZAI_API_KEY",
         "model": "glm-4.6",
+        "timeout": 60,       # Read timeout (seconds) per LLM request, scaled up for batched Stage 2 calls
+        "batch_timeout": 300,  # Upper bound (seconds) on the scaled read timeout of a batched call
+        "max_attempts": 3,   # Attempts per LLM request on transient errors
+        "max_concurrency": 4,  # Maximum in-flight LLM requests
+        "json_mode": False,  # Send response_format=json_object (OpenAI-compatible endpoints only)
+        "debug": False,      # Save unparseable LLM responses to debug_response_<pid>.txt
     },
 
     # Traditional factor weights (for backward compatibility)
@@ -68,7 +74,9 @@ DEFAULT_CONFIG = {
         "include_dependencies_analysis": True,
         "max_prompt_length": 500000,
         "temperature": 0.2,
-        "max_tokens": 1500
+        "max_tokens": 1500,
+        "batch_platform_analysis": True,  # Analyze multiple platforms in one Stage 2 LLM call
+        "skip_detection_when_forced": False  # With --force-platforms, skip the Stage 1 LLM call
     },
 
     # Hours estimation configuration
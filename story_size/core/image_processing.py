@@ -13,7 +13,8 @@ import io
 import numpy as np
 import logging
 import os
-import sys
+import contextlib
+import warnings
 
 logger = logging.getLogger(__name__)
 
@@ -36,20 +37,20 @@ class ImageProcessor:
     def ocr_reader(self):
         """Lazy initialization of OCR reader."""
         if not self._ocr_initialized:
-            # Completely suppress all output during OCR initialization
-            original_stdout = sys.stdout
-            original_stderr = sys.stderr
-            original_stdout_flush = sys.stdout.flush if hasattr(sys.stdout, 'flush') else lambda: None
-            original_stderr_flush = sys.stderr.flush if hasattr(sys.stderr, 'flush') else lambda: None
+            easyocr_logger = logging.getLogger("easyocr")
+            original_level = easyocr_logger.level
 
             try:
-                # Redirect all output to devnull
-                with open(os.devnull, 'w') as devnull:
-                    sys.stdout = devnull
-                    sys.stderr = devnull
+                # Suppress all output and warnings during OCR initialization only;
+                # the context managers restore streams and warning filters on exit
+                with open(os.devnull, 'w') as devnull, \
+                        contextlib.redirect_stdout(devnull), \
+                        contextlib.redirect_stderr(devnull), \
+                        warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
 
                     # Also suppress logging temporarily
-                    logging.getLogger("easyocr").setLevel(logging.CRITICAL)
+                    easyocr_logger.setLevel(logging.CRITICAL)
 
                     self._ocr_reader = easyocr.Reader(
                         self.languages,
@@ -71,12 +72,8 @@ class ImageProcessor:
                     logger.debug(f"OCR initialization failed (non-critical): {e}")
 
             finally:
-                # Always restore stdout and stderr
-                sys.stdout = original_stdout
-                sys.stderr = original_stderr
-
-                # Restore logging level
-                logging.getLogger("easyocr").setLevel(logging.NOTSET)
+                # Restore the previous logging level rather than resetting it
+                easyocr_logger.setLevel(original_level)
 
         return self._ocr_reader
 
@@ -1,5 +1,6 @@
 import json
 import os
+import orjson
 from datetime import datetime
 from typing import Dict, List, Optional
 from pathlib import Path
@@ -12,6 +13,8 @@ class LearningSystem:
         self.patterns_file = Path(__file__).parent.parent.parent / "learned_patterns.json"
         self.feedback_data = self._load_feedback()
         self.patterns = self._load_patterns()
+        # Bumped whenever learned patterns change so detection caches can invalidate
+        self.version = 0
 
     def _load_feedback(self) -> dict:
         """Load existing feedback data"""
@@ -46,14 +49,15 @@ class LearningSystem:
                          user_feedback: Optional[str] = None):
         """Record a correction when AI gets it wrong"""
 
+        doc_lower = doc_text.lower()
         correction = {
             "timestamp": datetime.now().isoformat(),
-            "doc_snippet": self._extract_snippet(doc_text),
+            "doc_snippet": self._extract_snippet(doc_text, text_lower=doc_lower),
             "detected_platforms": detected_platforms,
             "correct_platforms": correct_platforms,
             "application_name": application_name,
             "user_feedback": user_feedback,
-            "key_phrases": self._extract_key_phrases(doc_text),
+            "key_phrases": self._extract_key_phrases(doc_text, doc_lower),
             "confidence_boost": 0.1  # Will increase with more corrections
         }
 
@@ -70,10 +74,12 @@ class LearningSystem:
         self._save_feedback()
         self._update_patterns(correction)
 
-    def _extract_snippet(self, text: str, max_length: int = 200) -> str:
+    def _extract_snippet(self, text: str, max_length: int = 200,
+                         text_lower: Optional[str] = None) -> str:
         """Extract relevant snippet from document"""
         # Look for application names, platform indicators
-        text_lower = text.lower()
+        if text_lower is None:
+            text_lower = text.lower()
         indicators = ["application:", "app:", "platform:", "affected system:", "system:"]
 
         for indicator in indicators:
@@ -86,9 +92,10 @@ class LearningSystem:
         # If no indicators found, return first part
         return text[:max_length] + "..." if len(text) > max_length else text
 
-    def _extract_key_phrases(self, text: str) -> List[str]:
+    def _extract_key_phrases(self, text: str, text_lower: Optional[str] = None) -> List[str]:
         """Extract key phrases that might indicate platform"""
-        text_lower = text.lower()
+        if text_lower is None:
+            text_lower = text.lower()
         phrases = []
 
         # Common platform indicators
@@ -155,11 +162,13 @@ class LearningSystem:
 
             self.patterns["document_patterns"][phrase]["count"] += 1
 
+        self.version += 1
         self._save_patterns()
 
-    def get_improved_detection(self, doc_text: str) -> Optional[dict]:
+    def get_improved_detection(self, doc_text: str, doc_lower: Optional[str] = None) -> Optional[dict]:
         """Get improved platform detection based on learned patterns"""
-        doc_lower = doc_text.lower()
+        if doc_lower is None:
+            doc_lower = doc_text.lower()
 
         # Check for known applications
         for app_name, app_data in self.patterns["application_patterns"].items():
@@ -203,13 +212,13 @@ class LearningSystem:
 
     def _save_feedback(self):
         """Save feedback data"""
-        with open(self.feedback_file, 'w', encoding='utf-8') as f:
-            json.dump(self.feedback_data, f, indent=2, ensure_ascii=False)
+        with open(self.feedback_file, 'wb') as f:
+            f.write(orjson.dumps(self.feedback_data, option=orjson.OPT_INDENT_2))
 
     def _save_patterns(self):
         """Save learned patterns"""
-        with open(self.patterns_file, 'w', encoding='utf-8') as f:
-            json.dump(self.patterns, f, indent=2, ensure_ascii=False)
+        with open(self.patterns_file, 'wb') as f:
+            f.write(orjson.dumps(self.patterns, option=orjson.OPT_INDENT_2))
 
     def get_statistics(self) -> dict:
         """Get learning statistics"""
@@ -1,5 +1,7 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, ConfigDict, Field
+from dataclasses import dataclass
+import hashlib
+from typing import Any
 from pathlib import Path
 from datetime import datetime
 
@@ -13,9 +15,9 @@ class Factors(BaseModel):
 
 class CodeSummary(BaseModel):
     files_estimated: int
-    services_touched: List[str]
+    services_touched: list[str]
     db_migrations_estimated: int
-    languages_seen: List[str]
+    languages_seen: list[str]
 
 class ScoreExplanations(BaseModel):
     dc_explanation: str
@@ -26,11 +28,11 @@ class ScoreExplanations(BaseModel):
 
 class Estimation(BaseModel):
     story_points: int
-    scale: List[int]
+    scale: list[int]
     complexity_score: int
     factors: Factors
     confidence: float
-    rationale: List[str]
+    rationale: list[str]
     code_summary: CodeSummary
     score_explanations: ScoreExplanations
 
@@ -38,38 +40,56 @@ class Estimation(BaseModel):
 class PlatformRequirement(BaseModel):
     required: bool
     scope: str = Field(..., description="high, medium, low")
-    technologies: List[str] = []
+    technologies: list[str] = []
 
 class PlatformDetection(BaseModel):
-    platform_requirements: Dict[str, PlatformRequirement]
+    platform_requirements: dict[str, PlatformRequirement]
     work_item_type: str = Field(..., description="feature|bugfix|enhancement|refactor|research")
     complexity_level: str = Field(..., description="simple|moderate|complex|very_complex")
-    estimated_platforms: List[str]
+    estimated_platforms: list[str]
     confidence: float = Field(ge=0.0, le=1.0)
     reasoning: str
 
-class PlatformDirectories(BaseModel):
-    fe_dir: Optional[Path] = None
-    be_dir: Optional[Path] = None
-    mobile_dir: Optional[Path] = None
-    devops_dir: Optional[Path] = None
-    unified_dir: Optional[Path] = None  # For backward compatibility
+@dataclass(slots=True)
+class PlatformDirectories:
+    """Resolved platform code directories (plain data, built by DirectoryResolver)"""
+    fe_dir: Path | None = None
+    be_dir: Path | None = None
+    mobile_dir: Path | None = None
+    devops_dir: Path | None = None
+    unified_dir: Path | None = None  # For backward compatibility
 
 class PlatformCodeSummary(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     platform: str
-    directory: Optional[Path]
+    directory: Path | None
     files_estimated: int
-    languages_detected: List[str]
-    key_files: List[str]
-    loc_by_language: Dict[str, int]
-    complexity_indicators: Dict[str, Any] = {}
-    project_tree: Optional[str] = None  # Hierarchical directory structure for AI context
+    languages_detected: list[str]
+    key_files: list[str]
+    loc_by_language: dict[str, int]
+    complexity_indicators: dict[str, Any] = {}
+    project_tree: str | None = None  # Hierarchical directory structure for AI context
+
+    @property
+    def languages_csv(self) -> str:
+        """Comma-separated detected languages"""
+        return ", ".join(self.languages_detected)
+
+    def key_files_csv(self, limit: int) -> str:
+        """Comma-separated first `limit` key files"""
+        return ", ".join(self.key_files[:limit])
 
 class EnhancedCodeAnalysis(BaseModel):
-    platform_summaries: Dict[str, PlatformCodeSummary]
+    platform_summaries: dict[str, PlatformCodeSummary]
     total_files: int
-    total_languages: List[str]
-    cross_platform_dependencies: List[str] = []
+    total_languages: list[str]
+    cross_platform_dependencies: list[str] = []
+
+    def fingerprint(self) -> bytes:
+        """16-byte BLAKE2b digest of the platform summaries, for cache keys"""
+        summaries_json = self.model_dump_json(include={"platform_summaries"})
+        return hashlib.blake2b(summaries_json.encode("utf-8"), digest_size=16).digest()
 
 # Platform-specific factors
 class FrontendFactors(BaseModel):
@@ -101,37 +121,48 @@ class DevOpsFactors(BaseModel):
     security: int = Field(ge=1, le=5)
 
 class PlatformFactors(BaseModel):
-    frontend: Optional[FrontendFactors] = None
-    backend: Optional[BackendFactors] = None
-    mobile: Optional[MobileFactors] = None
-    devops: Optional[DevOpsFactors] = None
+    frontend: FrontendFactors | None = None
+    backend: BackendFactors | None = None
+    mobile: MobileFactors | None = None
+    devops: DevOpsFactors | None = None
 
 class PlatformScoreExplanations(BaseModel):
-    frontend_explanation: Optional[str] = None
-    backend_explanation: Optional[str] = None
-    mobile_explanation: Optional[str] = None
-    devops_explanation: Optional[str] = None
+    frontend_explanation: str | None = None
+    backend_explanation: str | None = None
+    mobile_explanation: str | None = None
+    devops_explanation: str | None = None
 
 class PlatformAnalysis(BaseModel):
     platform: str
-    factors: Dict[str, int]  # Platform-specific factors
+    factors: dict[str, int]  # Platform-specific factors
     explanation: str
     recommended_approach: str
-    estimated_hours: Dict[str, int]  # {"min": x, "max": y}
-    key_components: List[str] = []
-    key_challenges: List[str] = []
+    estimated_hours: dict[str, int]  # {"min": x, "max": y}
+    key_components: list[str] = []
+    key_challenges: list[str] = []
+
+@dataclass(slots=True)
+class StoryPointBreakdown:
+    """Story point calculation result (plain data, built by PlatformAwareAIClient)"""
+    by_platform: dict[str, int]
+    overall: int
+    base_sum: float
+    integration_multiplier: float
+    risk_multiplier: float
+    final_score: float
+    platform_impact_tiers: dict[str, str]
 
 class CompleteAnalysis(BaseModel):
     platform_detection: PlatformDetection
-    platform_analyses: Dict[str, PlatformAnalysis]
-    traditional_factors: Optional[Factors] = None  # Keep for backward compatibility
+    platform_analyses: dict[str, PlatformAnalysis]
+    traditional_factors: Factors | None = None  # Keep for backward compatibility
     overall_story_points: int
-    platform_story_points: Dict[str, int]
+    platform_story_points: dict[str, int]
     confidence_score: float
     analysis_timestamp: datetime = Field(default_factory=datetime.now)
 
 class EnhancedEstimation(BaseModel):
     """Enhanced estimation model that includes both traditional and platform-aware analysis"""
-    traditional_estimation: Optional[Estimation] = None  # Backward compatibility
+    traditional_estimation: Estimation | None = None  # Backward compatibility
     platform_analysis: CompleteAnalysis
     output_format: str = "enhanced"
@@ -1,14 +1,24 @@
+import io
 import os
-import json
-import requests
-from typing import Dict, Optional, List
+import re
+import orjson
+import random
+import asyncio
+import bisect
+import httpx
+import logging
+from collections import OrderedDict
+from functools import lru_cache
+from string import Template
+from types import MappingProxyType
+from typing import Dict, Optional, List, Tuple
 from pathlib import Path
 
 from story_size.core.models import (
     PlatformDetection, PlatformAnalysis, CompleteAnalysis,
-    PlatformRequirement, EnhancedCodeAnalysis
+    PlatformRequirement, EnhancedCodeAnalysis, StoryPointBreakdown
 )
-from story_size.core.platform_detector import PlatformDetector
+from story_size.core.platform_detector import PlatformDetector, doc_digest
 from story_size.core.context_detector import (
     auto_detect_context,
     RiskKeywordDetector,
@@ -21,40 +31,110 @@ from story_size.core.impact_analyzer import (
     analyze_all_platforms_impact
 )
 
-class PlatformAwareAIClient:
-    def __init__(self, config_data: dict):
-        self.config_data = config_data
-        self.llm_config = config_data.get("llm", {})
-        self.api_key_env = self.llm_config.get("api_key_env", "ZAI_API_KEY")
-        self.api_key = os.environ.get(self.api_key_env)
-        self.platform_detector = PlatformDetector()
-
-        if not self.api_key:
-            raise ValueError(f"API key not found in environment variable: {self.api_key_env}")
-
-        self.headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.api_key}",
-            "anthropic-version": "2023-06-01",
-        }
-
-    async def detect_platforms(self, doc_summary: str, code_analysis: EnhancedCodeAnalysis, force_platforms: Optional[str] = None) -> PlatformDetection:
-        """Stage 1: Detect required platforms"""
-
-        platform_structure = self._generate_platform_structure_analysis(code_analysis)
-
-        # Get application context
-        app_context = self.platform_detector.detect_platform_from_context(doc_summary)
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth retrying; anything else (auth, bad request) fails immediately
+_RETRYABLE_STATUS_CODES = frozenset((408, 429, 500, 502, 503, 504))
+
+# Longest server-requested Retry-After wait honoured before retrying, in seconds
+_MAX_RETRY_AFTER = 30
+
+# Request fields shared by every LLM call; only the model, messages and token budget vary
+_REQUEST_SKELETON = MappingProxyType({
+    "system": "You are an expert software architect analyzing technical requirements. Return ONLY valid JSON without any additional text or formatting.",
+    "temperature": 0.2,
+})
+
+# JSON object extraction from LLM output: a ```/```json code block first, then the outermost braces
+_FENCED_JSON_RE = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.DOTALL)
+_BARE_JSON_RE = re.compile(r"(\{.*\})", re.DOTALL)
+
+# Output token budgets per call; Stage 1 returns a short JSON object, Stage 2 a longer one per platform
+_DETECT_MAX_TOKENS = 800
+_ANALYZE_MAX_TOKENS = 1200
+
+# Maximum Stage 1 results kept per client
+_DETECTION_CACHE_SIZE = 128
+
+# Scores below this are served from a precomputed story point table; higher ones
+# (custom thresholds with a large top edge) bisect the bin edges instead
+_SP_LUT_SIZE = 512
+
+# Upper bound on platforms analysed in one Stage 2 call; larger prompts degrade per-platform accuracy
+_MAX_PLATFORMS_PER_BATCH = 4
+
+# Integration overhead multipliers, indexed by platform count (4+ share the last entry)
+_CONTEXT_SWITCHING_MULTIPLIERS = (1.0, 1.0, 1.15, 1.3, 1.5)
+_LEGACY_MULTIPLIERS = MappingProxyType({
+    "greenfield": 1.0,
+    "low_legacy": 1.05,
+    "moderate_legacy": 1.15,
+    "high_legacy": 1.25,
+    "critical_legacy": 1.4
+})
+_TRAFFIC_MULTIPLIERS = MappingProxyType({
+    "no_traffic": 1.0,
+    "low_traffic": 1.02,
+    "medium_traffic": 1.08,
+    "high_traffic": 1.15,
+    "critical_traffic": 1.25
+})
+
+# Platforms that may be forced via --force-platforms
+_PLATFORMS = ("frontend", "backend", "mobile", "devops")
+_VALID_PLATFORMS = frozenset(_PLATFORMS)
+
+_IMAGE_CONTEXT_DEFAULTS = {
+    "total_images": 0,
+    "images_with_text": 0,
+    "total_ocr_chars": 0,
+    "total_image_complexity": 0,
+}
+
+_IMAGE_INDICATOR_DEFAULTS = {
+    "has_diagrams": False,
+    "has_tables": False,
+    "has_screenshots": False,
+    "has_forms": False,
+    "has_workflows": False,
+    "has_icons": False,
+}
+
+_IMAGE_CONTEXT_TEMPLATE = Template("""
+VISUAL ELEMENTS ANALYSIS:
+========================
+Total images analyzed: $total_images
+Images with extracted text: $images_with_text
+Total OCR characters extracted: $total_ocr_chars
+Visual Complexity Score: $total_image_complexity (0-5 scale)
 
-        system_prompt = """
+Visual Elements Detected:
+• Diagrams/Charts: $has_diagrams
+• Tables: $has_tables
+• Screenshots: $has_screenshots
+• Forms: $has_forms
+• Workflows: $has_workflows
+• Icons/UI Elements: $has_icons
+""")
+
+_IMAGE_PLATFORM_NOTES_TEMPLATE = Template("""
+IMPORTANT for $platform_upper analysis:
+- Diagrams and workflows represent complex business logic that needs $platform implementation
+- Screenshots suggest UI changes or system integrations affecting $platform
+- Forms indicate user input validation requirements for $platform
+- Tables may imply data structure modifications affecting $platform
+- Multiple visual elements increase coordination needs for $platform development
+""")
+
+_DETECT_PROMPT_TEMPLATE = Template("""
 Analyze this work item and available codebase structure.
 
 TASK: Determine which platforms are needed and assess complexity.
 
 AVAILABLE CODE STRUCTURE:
-{platform_structure}
+$platform_structure
 
-{app_context}
+$app_context
 
 PLATFORMS TO CONSIDER:
 - Frontend (UI/UX, web application, components) - Use for web-based interfaces
@@ -82,81 +162,301 @@ COMPLEXITY LEVELS:
 - very_complex: High complexity, high risk
 
 RESPONSE FORMAT (JSON):
-{{
-  "platform_requirements": {{
-    "frontend": {{"required": true, "scope": "high|medium|low", "technologies": ["react", "typescript"]}},
-    "backend": {{"required": true, "scope": "high|medium|low", "technologies": ["dotnet", "sql"]}},
-    "mobile": {{"required": false, "scope": "high|medium|low", "technologies": ["flutter", "dart"]}},
-    "devops": {{"required": true, "scope": "high|medium|low", "technologies": ["docker", "k8s"]}}
-  }},
+{
+  "platform_requirements": {
+    "frontend": {"required": true, "scope": "high|medium|low", "technologies": ["react", "typescript"]},
+    "backend": {"required": true, "scope": "high|medium|low", "technologies": ["dotnet", "sql"]},
+    "mobile": {"required": false, "scope": "high|medium|low", "technologies": ["flutter", "dart"]},
+    "devops": {"required": true, "scope": "high|medium|low", "technologies": ["docker", "k8s"]}
+  },
   "work_item_type": "feature|bugfix|enhancement|refactor|research",
   "complexity_level": "simple|moderate|complex|very_complex",
   "estimated_platforms": ["frontend", "backend"],
   "confidence": 0.85,
   "reasoning": "Detailed explanation of why these platforms are needed based on the work item"
-}}
+}
 
 Work Item Documents:
 ---
-{doc_summary}
+$doc_summary
 ---
+""")
+
+_ANALYZE_PROMPT_TEMPLATE = Template("""
+Analyze this $platform work item with detailed code context.
+
+$platform_prompt
+
+WORK ITEM:
+$doc_summary
+
+$platform_upper CODEBASE CONTEXT:
+$platform_context
+
+$image_context
+
+TASK: Provide detailed $platform complexity analysis and recommendations.
+
+Focus on:
+- Technical complexity specific to $platform
+- Integration challenges
+- Key components that need modification
+- Implementation approach
+- Potential risks and challenges
+
+Response format (JSON):
+{
+  "factors": {
+    $factors_template
+  },
+  "explanation": "Detailed explanation of $platform complexity and approach",
+  "recommended_approach": "Specific technical approach and tools",
+  "estimated_hours": {"min": 16, "max": 24},
+  "key_components": ["Component1", "Component2"],
+  "key_challenges": ["Challenge1", "Challenge2"]
+}
+""")
+
+_BATCH_ANALYZE_PROMPT_TEMPLATE = Template("""
+Analyze this work item for each of the following platforms with detailed code context.
+
+WORK ITEM:
+$doc_summary
+
+$image_context
+
+PLATFORMS TO ANALYZE:
+$platform_blocks
+
+TASK: For EACH platform above, provide a detailed, independent complexity analysis and recommendations.
+
+Focus on, per platform:
+- Technical complexity specific to that platform
+- Integration challenges
+- Key components that need modification
+- Implementation approach
+- Potential risks and challenges
+
+Response format (JSON), with one entry per platform listed above:
+{
+  "analyses": {
+$response_blocks
+  }
+}
+""")
+
+_PLATFORM_PROMPTS = {
+    "frontend": """
+FRONTEND ANALYSIS FACTORS:
+- UI Complexity: Component complexity, state management, visual design
+- User Interaction: Forms, validation, user flows, accessibility
+- Performance: Rendering optimization, lazy loading, bundle size
+- Integration: API integration, third-party services, routing
+- Testing: Unit tests, integration tests, E2E testing needs
+""",
+
+    "backend": """
+BACKEND ANALYSIS FACTORS:
+- Business Logic: Domain complexity, validation rules, business workflows
+- Database Impact: Schema changes, migrations, query complexity
+- API Design: Endpoint complexity, request/response models, documentation
+- Integration: External services, message queues, caching
+- Security & Performance: Authentication, authorization, optimization
+""",
+
+    "mobile": """
+MOBILE ANALYSIS FACTORS:
+- Platform Complexity: Native features, platform-specific UI/UX
+- Offline Support: Local storage, sync capabilities, conflict resolution
+- Device Integration: Camera, GPS, push notifications, biometrics
+- App Store Requirements: Submission complexity, review considerations
+- Cross-Platform: Framework complexity, platform differences
+""",
+
+    "devops": """
+DEVOPS ANALYSIS FACTORS:
+- Infrastructure: Server setup, networking, load balancing
+- Automation: CI/CD pipelines, automated testing, deployment scripts
+- Deployment: Containerization, orchestration, environment management
+- Monitoring: Logging, metrics, alerting, health checks
+- Security: Access control, secrets management, compliance
 """
+}
+
+_DEFAULT_PLATFORM_PROMPT = "Analyze this platform for technical complexity."
+
+_PLATFORM_FACTOR_TEMPLATES = {
+    "frontend": '"ui_complexity": 3, "user_interaction": 4, "performance": 2, "integration": 3, "testing": 3',
+    "backend": '"business_logic": 4, "database_impact": 3, "api_design": 3, "integration": 2, "security_performance": 4',
+    "mobile": '"platform_complexity": 4, "offline_support": 3, "device_integration": 2, "app_store_requirements": 2, "cross_platform": 3',
+    "devops": '"infrastructure": 3, "automation": 4, "deployment": 3, "monitoring": 2, "security": 3'
+}
+
+_DEFAULT_FACTORS_TEMPLATE = '"complexity": 3'
+
+@lru_cache(maxsize=64)
+def _render_platform_context(platform: str, files_estimated: int, languages_csv: str,
+                             directory: Optional[Path], key_files_csv: Optional[str],
+                             loc_items: Tuple[Tuple[str, int], ...], total_large: Optional[int]) -> str:
+    """Render the Stage 2 codebase context block from hashable summary fields"""
+
+    context_lines = [
+        f"Platform: {platform.upper()}",
+        f"Files: {files_estimated}",
+        f"Languages: {languages_csv}",
+        f"Directory: {directory}"
+    ]
+
+    if key_files_csv:
+        context_lines.append(f"Key Files: {key_files_csv}")
+
+    if loc_items:
+        loc_info = [f"{lang}: {loc} LOC" for lang, loc in loc_items]
+        context_lines.append(f"Lines of Code by Language: {', '.join(loc_info)}")
+
+    if total_large is not None:
+        context_lines.append(f"Large Files (>500 lines): {total_large}")
+
+    return "\n".join(context_lines)
+
+class PlatformAwareAIClient:
+    def __init__(self, config_data: dict):
+        self.config_data = config_data
+        self.llm_config = config_data.get("llm", {})
+        self.analysis_options = config_data.get("analysis_options", {})
+        self._debug = bool(self.llm_config.get("debug", False))
+        self.api_key_env = self.llm_config.get("api_key_env", "ZAI_API_KEY")
+        self.api_key = os.environ.get(self.api_key_env)
+        self.platform_detector = PlatformDetector()
+        self._detection_cache: OrderedDict[tuple, PlatformDetection] = OrderedDict()
+        self._image_context_cache: Optional[tuple] = None
+
+        # Story point bin edges never change after load, so resolve them once
+        mapping = config_data.get("platform_mapping", {})
+        self._sp_edges = (
+            (mapping.get("sp1_max", 5), 1),
+            (mapping.get("sp2_max", 8), 2),
+            (mapping.get("sp3_max", 12), 3),
+            (mapping.get("sp5_max", 16), 5),
+            (mapping.get("sp8_max", 20), 8),
+        )
+        self._sp_thresholds = tuple(edge for edge, _ in self._sp_edges)
+        self._sp_values = tuple(story_points for _, story_points in self._sp_edges) + (13,)
+        # Scores are small non-negative integers, so precompute the common range
+        lut_size = min(int(max(self._sp_thresholds)) + 1, _SP_LUT_SIZE)
+        self._sp_lut = tuple(self._scan_sp_edges(score) for score in range(lut_size))
+
+        if not self.api_key:
+            raise ValueError(f"API key not found in environment variable: {self.api_key_env}")
+
+        # Resolve per-request settings once instead of on every call
+        self._model = self.llm_config.get("model", "glm-4.6")
+        self._endpoint = self.llm_config.get("endpoint")
+        self._json_mode = bool(self.llm_config.get("json_mode", False))
+        self._max_attempts = max(1, self.llm_config.get("max_attempts", 3))
+        self._read_timeout = float(self.llm_config.get("timeout", 60.0))
+        self._batch_timeout = max(self._read_timeout, float(self.llm_config.get("batch_timeout", 300.0)))
+
+        self.headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.api_key}",
+            "anthropic-version": "2023-06-01",
+        }
 
-        user_prompt = system_prompt.format(
+        # Bound in-flight LLM requests so concurrent Stage 2 calls stay under provider rate limits
+        self._llm_semaphore = asyncio.Semaphore(max(1, self.llm_config.get("max_concurrency", 4)))
+
+        # One pooled HTTP/2 client for every LLM call, so Stage 1 and Stage 2
+        # requests reuse the same TLS connection instead of reconnecting
+        self._http_client = httpx.AsyncClient(
+            http2=True,
+            headers=self.headers,
+            timeout=httpx.Timeout(self._read_timeout, connect=5.0),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        )
+
+    async def __aenter__(self) -> "PlatformAwareAIClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """Close the pooled HTTP client"""
+        await self._http_client.aclose()
+
+    async def detect_platforms(self, doc_summary: str, code_analysis: EnhancedCodeAnalysis, force_platforms: Optional[str] = None,
+                               platform_structure: Optional[str] = None) -> PlatformDetection:
+        """Stage 1: Detect required platforms"""
+
+        # Re-analysing the same document and code skips the LLM round-trip
+        digest = doc_digest(doc_summary)
+        cache_key = (digest, code_analysis.fingerprint(), force_platforms)
+        cached = self._detection_cache.get(cache_key)
+        if cached is not None:
+            self._detection_cache.move_to_end(cache_key)
+            return cached.model_copy(deep=True)
+
+        forced_platforms = [p.strip().lower() for p in force_platforms.split(',')] if force_platforms else None
+
+        if forced_platforms and self.analysis_options.get("skip_detection_when_forced", False):
+            return self._forced_platform_detection(forced_platforms)
+
+        if platform_structure is None:
+            platform_structure = self._generate_platform_structure_analysis(code_analysis)
+
+        # Get application context
+        app_context = self._get_app_context(doc_summary, digest)
+
+        user_prompt = _DETECT_PROMPT_TEMPLATE.substitute(
             platform_structure=platform_structure,
             app_context=f"APPLICATION CONTEXT:\n{app_context['reasoning']}\nLikely platforms: {', '.join(app_context['detected_platforms'])}",
             doc_summary=doc_summary
         )
 
         # Override platforms if force_platforms is specified
-        if force_platforms:
-            forced_platforms = [p.strip().lower() for p in force_platforms.split(',')]
-
+        if forced_platforms:
             # Add override instruction to prompt
             user_prompt += f"\n\nIMPORTANT OVERRIDE: The user has specified that this work item is for these platforms ONLY: {', '.join(forced_platforms)}. "
             user_prompt += "Ignore any automatic detection and use these exact platforms."
 
-        response_data = await self._call_llm(user_prompt)
-
-        # Parse platform requirements
-        platform_requirements = {}
-        for platform, req_data in response_data["platform_requirements"].items():
-            platform_requirements[platform] = PlatformRequirement(**req_data)
+        response_data = await self._call_llm(user_prompt, max_tokens=_DETECT_MAX_TOKENS)
 
         # Apply force_platforms override if specified
-        if force_platforms:
-            forced_platforms = [p.strip().lower() for p in force_platforms.split(',')]
-
-            # Reset all platforms to not required
-            for platform in platform_requirements:
-                platform_requirements[platform].required = False
-
-            # Set forced platforms as required
-            platform_mapping = {
-                'frontend': 'frontend',
-                'backend': 'backend',
-                'mobile': 'mobile',
-                'devops': 'devops'
-            }
-
-            for forced_platform in forced_platforms:
-                if forced_platform in platform_mapping:
-                    platform_name = platform_mapping[forced_platform]
-                    if platform_name in platform_requirements:
-                        platform_requirements[platform_name].required = True
-
+        if forced_platforms:
             # Update estimated platforms
             response_data["estimated_platforms"] = forced_platforms
             response_data["confidence"] = 1.0  # Maximum confidence when forced
             response_data["reasoning"] = f"Platforms forced by user: {', '.join(forced_platforms)}"
 
+        # Validate the whole response (including nested platform requirements) in one pass
+        platform_detection = PlatformDetection.model_validate(response_data)
+
+        if forced_platforms:
+            # Only forced (known) platforms are required
+            required_platforms = _VALID_PLATFORMS.intersection(forced_platforms)
+            for platform, requirement in platform_detection.platform_requirements.items():
+                requirement.required = platform in required_platforms
+
+        self._detection_cache[cache_key] = platform_detection.model_copy(deep=True)
+        if len(self._detection_cache) > _DETECTION_CACHE_SIZE:
+            self._detection_cache.popitem(last=False)
+
+        return platform_detection
+
+    def _forced_platform_detection(self, forced_platforms: List[str]) -> PlatformDetection:
+        """Build a Stage 1 result straight from --force-platforms without calling the LLM"""
+
         return PlatformDetection(
-            platform_requirements=platform_requirements,
-            work_item_type=response_data["work_item_type"],
-            complexity_level=response_data["complexity_level"],
-            estimated_platforms=response_data["estimated_platforms"],
-            confidence=response_data["confidence"],
-            reasoning=response_data["reasoning"]
+            platform_requirements={
+                platform: PlatformRequirement(required=platform in forced_platforms, scope="medium")
+                for platform in _PLATFORMS
+            },
+            work_item_type="feature",
+            complexity_level="moderate",
+            estimated_platforms=forced_platforms,
+            confidence=1.0,
+            reasoning=f"Platforms forced by user: {', '.join(forced_platforms)}"
         )
 
     async def analyze_platform(self,
@@ -172,93 +472,95 @@ Work Item Documents:
 
         if not platform_summary or platform_summary.files_estimated == 0:
             # Return empty analysis for platforms without code
-            return PlatformAnalysis(
-                platform=platform,
-                factors={},
-                explanation=f"No {platform} code detected in the repository.",
-                recommended_approach="",
-                estimated_hours={"min": 0, "max": 0},
-                key_components=[],
-                key_challenges=[]
-            )
+            return self._empty_platform_analysis(platform)
 
         platform_prompt = self._get_platform_specific_prompt(platform)
         platform_context = self._generate_platform_context(platform_summary, platform)
 
         # Add image context if available
-        image_context = ""
-        if image_analysis and image_analysis.get('total_images', 0) > 0:
-            indicators = image_analysis.get('complexity_indicators', {})
-            image_context = f"""
-VISUAL ELEMENTS ANALYSIS:
-========================
-Total images analyzed: {image_analysis.get('total_images', 0)}
-Images with extracted text: {image_analysis.get('images_with_text', 0)}
-Total OCR characters extracted: {image_analysis.get('total_ocr_chars', 0)}
-Visual Complexity Score: {image_analysis.get('total_image_complexity', 0)} (0-5 scale)
-
-Visual Elements Detected:
-• Diagrams/Charts: {indicators.get('has_diagrams', False)}
-• Tables: {indicators.get('has_tables', False)}
-• Screenshots: {indicators.get('has_screenshots', False)}
-• Forms: {indicators.get('has_forms', False)}
-• Workflows: {indicators.get('has_workflows', False)}
-• Icons/UI Elements: {indicators.get('has_icons', False)}
-
-IMPORTANT for {platform.upper()} analysis:
-- Diagrams and workflows represent complex business logic that needs {platform} implementation
-- Screenshots suggest UI changes or system integrations affecting {platform}
-- Forms indicate user input validation requirements for {platform}
-- Tables may imply data structure modifications affecting {platform}
-- Multiple visual elements increase coordination needs for {platform} development
-"""
-
-        system_prompt = f"""
-Analyze this {platform} work item with detailed code context.
+        image_context = self._build_image_context(image_analysis, platform)
 
-{platform_prompt}
+        system_prompt = _ANALYZE_PROMPT_TEMPLATE.substitute(
+            platform=platform,
+            platform_upper=platform.upper(),
+            platform_prompt=platform_prompt,
+            doc_summary=doc_summary,
+            platform_context=platform_context,
+            image_context=image_context,
+            factors_template=self._get_platform_factors_template(platform)
+        )
 
-WORK ITEM:
-{doc_summary}
+        response_data = await self._call_llm(system_prompt, max_tokens=_ANALYZE_MAX_TOKENS)
+
+        response_data["platform"] = platform
+        return PlatformAnalysis.model_validate(response_data)
+
+    async def analyze_platforms_batched(self,
+                                        platforms: List[str],
+                                        doc_summary: str,
+                                        code_analysis: EnhancedCodeAnalysis,
+                                        platform_detection: PlatformDetection,
+                                        image_analysis: dict = None) -> Dict[str, PlatformAnalysis]:
+        """Stage 2: Analyze several platforms in a single LLM call sharing one work item preamble"""
+
+        platform_analyses = {}
+        platform_sections = []
+        factor_sections = []
+
+        for platform in platforms:
+            platform_summary = code_analysis.platform_summaries.get(platform)
+            if not platform_summary or platform_summary.files_estimated == 0:
+                platform_analyses[platform] = self._empty_platform_analysis(platform)
+                continue
+
+            platform_sections.append(
+                f"=== {platform.upper()} ===\n"
+                f"{self._get_platform_specific_prompt(platform).strip()}\n\n"
+                f"{platform.upper()} CODEBASE CONTEXT:\n"
+                f"{self._generate_platform_context(platform_summary, platform)}\n"
+            )
+            factor_sections.append(
+                f'    "{platform}": {{\n'
+                f'      "factors": {{{self._get_platform_factors_template(platform)}}},\n'
+                f'      "explanation": "Detailed explanation of {platform} complexity and approach",\n'
+                f'      "recommended_approach": "Specific technical approach and tools",\n'
+                f'      "estimated_hours": {{"min": 16, "max": 24}},\n'
+                f'      "key_components": ["Component1", "Component2"],\n'
+                f'      "key_challenges": ["Challenge1", "Challenge2"]\n'
+                f'    }}'
+            )
 
-{platform.upper()} CODEBASE CONTEXT:
-{platform_context}
+        analyzed_platforms = [p for p in platforms if p not in platform_analyses]
+        if not analyzed_platforms:
+            return platform_analyses
 
-{image_context}
+        image_context = self._build_image_context(image_analysis, "/".join(analyzed_platforms))
 
-TASK: Provide detailed {platform} complexity analysis and recommendations.
+        system_prompt = _BATCH_ANALYZE_PROMPT_TEMPLATE.substitute(
+            doc_summary=doc_summary,
+            image_context=image_context,
+            platform_blocks="\n".join(platform_sections),
+            response_blocks=",\n".join(factor_sections)
+        )
 
-Focus on:
-- Technical complexity specific to {platform}
-- Integration challenges
-- Key components that need modification
-- Implementation approach
-- Potential risks and challenges
+        # Each platform needs roughly the output budget of a single-platform call
+        max_tokens = min(_ANALYZE_MAX_TOKENS * len(analyzed_platforms), 8000)
+        response_data = await self._call_llm(system_prompt, max_tokens=max_tokens)
+        analyses = response_data.get("analyses", {})
 
-Response format (JSON):
-{{
-  "factors": {{
-    {self._get_platform_factors_template(platform)}
-  }},
-  "explanation": "Detailed explanation of {platform} complexity and approach",
-  "recommended_approach": "Specific technical approach and tools",
-  "estimated_hours": {{"min": 16, "max": 24}},
-  "key_components": ["Component1", "Component2"],
-  "key_challenges": ["Challenge1", "Challenge2"]
-}}
-"""
+        platform_analyses.update({
+            platform: PlatformAnalysis.model_validate({**analyses[platform], "platform": platform})
+            for platform in analyzed_platforms if platform in analyses
+        })
 
-        response_data = await self._call_llm(system_prompt)
+        for platform in analyzed_platforms:
+            if platform not in platform_analyses:
+                # The model skipped this platform; fall back to a dedicated call
+                platform_analyses[platform] = await self.analyze_platform(
+                    platform, doc_summary, code_analysis, platform_detection, image_analysis
+                )
 
-        return PlatformAnalysis(
-            platform=platform,
-            factors=response_data["factors"],
-            explanation=response_data["explanation"],
-            recommended_approach=response_data["recommended_approach"],
-            estimated_hours=response_data["estimated_hours"],
-            key_components=response_data.get("key_components", []),
-            key_challenges=response_data.get("key_challenges", [])
-        )
+        return {platform: platform_analyses[platform] for platform in platforms}
 
     async def get_complete_analysis(self,
                                   doc_summary: str,
@@ -272,42 +574,56 @@ Response format (JSON):
             # Stage 1: Detect platforms
             # Check if we have image analysis to include
             if image_analysis and image_analysis.get('total_images', 0) > 0:
-                print(f"[INFO] Processing with image analysis: {image_analysis.get('total_images')} images found")
-
-            print("Stage 1: Detecting required platforms...")
-            platform_detection = await self.detect_platforms(doc_summary, code_analysis, force_platforms)
+                logger.info("[INFO] Processing with image analysis: %s images found", image_analysis.get('total_images'))
+
+            logger.info("Stage 1: Detecting required platforms...")
+            # code_analysis does not change during a run, so the structure summary is built once
+            platform_structure = self._generate_platform_structure_analysis(code_analysis)
+
+            # Impact analysis and context detection scan the filesystem; run them in worker
+            # threads while the Stage 1 LLM request is in flight instead of blocking the loop
+            platform_detection, impact_scopes, context_data = await asyncio.gather(
+                self.detect_platforms(doc_summary, code_analysis, force_platforms, platform_structure=platform_structure),
+                asyncio.to_thread(analyze_all_platforms_impact, doc_summary, code_analysis),
+                self._detect_context(code_dir, doc_summary)
+            )
 
-            print(f"Platforms detected: {', '.join(platform_detection.estimated_platforms)}")
-            print(f"Work item type: {platform_detection.work_item_type}")
-            print(f"Complexity level: {platform_detection.complexity_level}")
+            logger.info("Platforms detected: %s", ', '.join(platform_detection.estimated_platforms))
+            logger.info("Work item type: %s", platform_detection.work_item_type)
+            logger.info("Complexity level: %s", platform_detection.complexity_level)
 
             # Stage 1.5: Impact Analysis (NEW!)
-            print("Stage 1.5: Analyzing impact scope...")
-            impact_scopes = analyze_all_platforms_impact(doc_summary, code_analysis)
-
+            logger.info("Stage 1.5: Analyzing impact scope...")
             for platform, impact in impact_scopes.items():
-                print(f"  {platform.upper()}: {impact.total_affected_files} files affected ({impact.impact_ratio:.1%})")
+                logger.info("  %s: %s files affected (%.1f%%)",
+                            platform.upper(), impact.total_affected_files, impact.impact_ratio * 100)
 
             # Auto-detect context for transparency
-            if code_dir:
-                context_summary = self.get_context_summary(code_dir, doc_summary)
+            if code_dir and code_dir.exists():
+                context_summary = context_data
                 if context_summary:
-                    print(f"[Auto-detected Context]")
+                    logger.info("[Auto-detected Context]")
                     if context_summary.get("legacy_status"):
-                        print(f"  Legacy Status: {context_summary['legacy_status']}")
+                        logger.info("  Legacy Status: %s", context_summary['legacy_status'])
                     if context_summary.get("traffic_volume"):
-                        print(f"  Traffic Volume: {context_summary['traffic_volume']}")
+                        logger.info("  Traffic Volume: %s", context_summary['traffic_volume'])
                     if context_summary.get("risk_multiplier", 1.0) > 1.0:
-                        print(f"  Risk Multiplier: {context_summary['risk_multiplier']}")
-
-            # Stage 2: Analyze each required platform
-            platform_analyses = {}
-            for platform in platform_detection.estimated_platforms:
-                print(f"Stage 2: Analyzing {platform}...")
-                platform_analyses[platform] = await self.analyze_platform(
-                    platform, doc_summary, code_analysis, platform_detection, image_analysis
-                )
-                print(f"{platform} analysis complete")
+                        logger.info("  Risk Multiplier: %s", context_summary['risk_multiplier'])
+
+            # Stage 2: Analyze required platforms, batching several into one LLM call when enabled
+            estimated_platforms = platform_detection.estimated_platforms
+            batch_size = _MAX_PLATFORMS_PER_BATCH if self.analysis_options.get("batch_platform_analysis", True) else 1
+            batches = [estimated_platforms[i:i + batch_size] for i in range(0, len(estimated_platforms), batch_size)]
+            results = await asyncio.gather(*(
+                self._analyze_platform_batch(batch, doc_summary, code_analysis, platform_detection, image_analysis)
+                for batch in batches
+            ), return_exceptions=True)
+            # Surface the first failure only after every batch has settled, so no sibling
+            # request is still in flight when the caller closes the shared HTTP client
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+            platform_analyses = {platform: analysis for batch_result in results for platform, analysis in batch_result.items()}
 
             # Calculate story points with enhanced formula (impact × integration × risk)
             story_points_data = await self._calculate_story_points(
@@ -316,151 +632,162 @@ Response format (JSON):
                 code_analysis,
                 code_dir,
                 doc_summary,
-                impact_scopes  # NEW: Pass impact scopes
+                impact_scopes,  # NEW: Pass impact scopes
+                context_data
             )
 
             return CompleteAnalysis(
                 platform_detection=platform_detection,
                 platform_analyses=platform_analyses,
-                overall_story_points=story_points_data["overall"],
-                platform_story_points=story_points_data["by_platform"],
+                overall_story_points=story_points_data.overall,
+                platform_story_points=story_points_data.by_platform,
                 confidence_score=platform_detection.confidence
             )
 
         except Exception as e:
-            print(f"Platform-aware analysis failed: {e}")
+            logger.error("Platform-aware analysis failed: %s", e)
             # Re-raise the exception since traditional fallback is removed
             raise Exception(f"Platform-aware analysis failed and no fallback available: {e}")
 
-    def _generate_platform_structure_analysis(self, code_analysis: EnhancedCodeAnalysis) -> str:
-        """Generate structured analysis of available platform code with project tree"""
+    async def _analyze_platform_batch(self,
+                                      platforms: List[str],
+                                      doc_summary: str,
+                                      code_analysis: EnhancedCodeAnalysis,
+                                      platform_detection: PlatformDetection,
+                                      image_analysis: dict = None) -> Dict[str, PlatformAnalysis]:
+        """Run one Stage 2 batch (single or multi-platform) with progress logging"""
+
+        platform_names = ", ".join(platforms)
+        logger.info("Stage 2: Analyzing %s...", platform_names)
+        if len(platforms) == 1:
+            analysis = await self.analyze_platform(
+                platforms[0], doc_summary, code_analysis, platform_detection, image_analysis
+            )
+            analyses = {platforms[0]: analysis}
+        else:
+            analyses = await self.analyze_platforms_batched(
+                platforms, doc_summary, code_analysis, platform_detection, image_analysis
+            )
+        logger.info("%s analysis complete", platform_names)
+        return analyses
 
-        structure_lines = []
-        if code_analysis.platform_summaries:
-            for platform, summary in code_analysis.platform_summaries.items():
-                if summary.files_estimated > 0:
-                    structure_lines.append(f"[PLATFORM] {platform.upper()}:")
-                    structure_lines.append(f"  - Files: {summary.files_estimated}")
-                    structure_lines.append(f"  - Languages: {', '.join(summary.languages_detected)}")
-                    structure_lines.append(f"  - Key Files: {', '.join(summary.key_files[:3])}")
-                    if summary.complexity_indicators:
-                        loc = summary.complexity_indicators.get("total_loc", 0)
-                        structure_lines.append(f"  - Lines of Code: {loc}")
+    def _empty_platform_analysis(self, platform: str) -> PlatformAnalysis:
+        """Placeholder analysis for a platform with no code in the repository"""
 
-                    # Add project tree for better AI context
-                    if summary.project_tree:
-                        structure_lines.append(f"  - Project Structure:")
-                        for tree_line in summary.project_tree.split("\n"):
-                            structure_lines.append(f"    {tree_line}")
+        return PlatformAnalysis(
+            platform=platform,
+            factors={},
+            explanation=f"No {platform} code detected in the repository.",
+            recommended_approach="",
+            estimated_hours={"min": 0, "max": 0},
+            key_components=[],
+            key_challenges=[]
+        )
 
-                    structure_lines.append("")
+    def _build_image_context(self, image_analysis: Optional[dict], platform: str) -> str:
+        """Render the visual elements block, or an empty string when there are no images"""
 
-        return "\n".join(structure_lines) if structure_lines else "No platform-specific code detected."
+        if not image_analysis or image_analysis.get('total_images', 0) <= 0:
+            return ""
 
-    def _generate_platform_context(self, platform_summary, platform: str) -> str:
-        """Generate platform-specific code context"""
+        # The statistics part only depends on image_analysis, so render it once per analysis
+        cached = self._image_context_cache
+        if cached is not None and cached[0] is image_analysis:
+            common_context = cached[1]
+        else:
+            common_context = _IMAGE_CONTEXT_TEMPLATE.substitute({
+                **_IMAGE_CONTEXT_DEFAULTS,
+                **image_analysis,
+                **_IMAGE_INDICATOR_DEFAULTS,
+                **image_analysis.get('complexity_indicators', {}),
+            })
+            self._image_context_cache = (image_analysis, common_context)
+
+        return common_context + _IMAGE_PLATFORM_NOTES_TEMPLATE.substitute(
+            platform=platform,
+            platform_upper=platform.upper()
+        )
 
-        context_lines = [
-            f"Platform: {platform.upper()}",
-            f"Files: {platform_summary.files_estimated}",
-            f"Languages: {', '.join(platform_summary.languages_detected)}",
-            f"Directory: {platform_summary.directory}"
-        ]
+    def _get_app_context(self, doc_summary: str, digest: Optional[bytes] = None) -> dict:
+        """Detect application context (memoized per document by the platform detector)"""
 
-        if platform_summary.key_files:
-            context_lines.append(f"Key Files: {', '.join(platform_summary.key_files[:5])}")
+        return self.platform_detector.detect_platform_from_context(doc_summary, digest=digest)
 
-        if platform_summary.loc_by_language:
-            loc_info = [f"{lang}: {loc} LOC" for lang, loc in platform_summary.loc_by_language.items()]
-            context_lines.append(f"Lines of Code by Language: {', '.join(loc_info)}")
+    def _generate_platform_structure_analysis(self, code_analysis: EnhancedCodeAnalysis) -> str:
+        """Generate structured analysis of available platform code with project tree"""
 
-        if platform_summary.complexity_indicators:
-            indicators = platform_summary.complexity_indicators
-            if indicators.get("large_files"):
-                total_large = sum(indicators["large_files"].values())
-                context_lines.append(f"Large Files (>500 lines): {total_large}")
+        buf = io.StringIO()
+        for platform, summary in code_analysis.platform_summaries.items():
+            if summary.files_estimated <= 0:
+                continue
 
-        return "\n".join(context_lines)
+            buf.write(f"[PLATFORM] {platform.upper()}:\n"
+                      f"  - Files: {summary.files_estimated}\n"
+                      f"  - Languages: {summary.languages_csv}\n"
+                      f"  - Key Files: {summary.key_files_csv(3)}\n")
+            if summary.complexity_indicators:
+                buf.write(f"  - Lines of Code: {summary.complexity_indicators.get('total_loc', 0)}\n")
 
-    def _get_platform_specific_prompt(self, platform: str) -> str:
-        """Get platform-specific analysis prompt"""
+            # Add project tree for better AI context
+            if summary.project_tree:
+                buf.write("  - Project Structure:\n    ")
+                buf.write(summary.project_tree.replace("\n", "\n    "))
+                buf.write("\n")
 
-        prompts = {
-            "frontend": """
-FRONTEND ANALYSIS FACTORS:
-- UI Complexity: Component complexity, state management, visual design
-- User Interaction: Forms, validation, user flows, accessibility
-- Performance: Rendering optimization, lazy loading, bundle size
-- Integration: API integration, third-party services, routing
-- Testing: Unit tests, integration tests, E2E testing needs
-            """,
+            buf.write("\n")
 
-            "backend": """
-BACKEND ANALYSIS FACTORS:
-- Business Logic: Domain complexity, validation rules, business workflows
-- Database Impact: Schema changes, migrations, query complexity
-- API Design: Endpoint complexity, request/response models, documentation
-- Integration: External services, message queues, caching
-- Security & Performance: Authentication, authorization, optimization
-            """,
+        # Every block ends with a blank separator line; drop the final newline
+        structure = buf.getvalue()
+        return structure[:-1] if structure else "No platform-specific code detected."
 
-            "mobile": """
-MOBILE ANALYSIS FACTORS:
-- Platform Complexity: Native features, platform-specific UI/UX
-- Offline Support: Local storage, sync capabilities, conflict resolution
-- Device Integration: Camera, GPS, push notifications, biometrics
-- App Store Requirements: Submission complexity, review considerations
-- Cross-Platform: Framework complexity, platform differences
-            """,
+    def _generate_platform_context(self, platform_summary, platform: str) -> str:
+        """Generate platform-specific code context"""
 
-            "devops": """
-DEVOPS ANALYSIS FACTORS:
-- Infrastructure: Server setup, networking, load balancing
-- Automation: CI/CD pipelines, automated testing, deployment scripts
-- Deployment: Containerization, orchestration, environment management
-- Monitoring: Logging, metrics, alerting, health checks
-- Security: Access control, secrets management, compliance
-            """
-        }
+        indicators = platform_summary.complexity_indicators
+        large_files = indicators.get("large_files") if indicators else None
+
+        return _render_platform_context(
+            platform,
+            platform_summary.files_estimated,
+            platform_summary.languages_csv,
+            platform_summary.directory,
+            platform_summary.key_files_csv(5) if platform_summary.key_files else None,
+            tuple(platform_summary.loc_by_language.items()),
+            sum(large_files.values()) if large_files else None
+        )
 
-        return prompts.get(platform, "Analyze this platform for technical complexity.")
+    def _get_platform_specific_prompt(self, platform: str) -> str:
+        """Get platform-specific analysis prompt"""
+
+        return _PLATFORM_PROMPTS.get(platform, _DEFAULT_PLATFORM_PROMPT)
 
     def _get_platform_factors_template(self, platform: str) -> str:
         """Get platform-specific factors JSON template"""
 
-        templates = {
-            "frontend": '"ui_complexity": 3, "user_interaction": 4, "performance": 2, "integration": 3, "testing": 3',
-            "backend": '"business_logic": 4, "database_impact": 3, "api_design": 3, "integration": 2, "security_performance": 4',
-            "mobile": '"platform_complexity": 4, "offline_support": 3, "device_integration": 2, "app_store_requirements": 2, "cross_platform": 3',
-            "devops": '"infrastructure": 3, "automation": 4, "deployment": 3, "monitoring": 2, "security": 3'
-        }
-
-        return templates.get(platform, '"complexity": 3')
+        return _PLATFORM_FACTOR_TEMPLATES.get(platform, _DEFAULT_FACTORS_TEMPLATE)
 
-    async def _call_llm(self, prompt: str) -> dict:
+    async def _call_llm(self, prompt: str, *, max_tokens: int = _ANALYZE_MAX_TOKENS) -> dict:
         """Call the LLM API with error handling"""
 
         data = {
-            "model": self.llm_config.get("model", "glm-4.6"),
-            "system": "You are an expert software architect analyzing technical requirements. Return ONLY valid JSON without any additional text or formatting.",
+            **_REQUEST_SKELETON,
+            "model": self._model,
             "messages": [
                 {
                     "role": "user",
                     "content": prompt
                 }
             ],
-            "max_tokens": 1500,
-            "temperature": 0.2,
+            "max_tokens": max_tokens,
         }
 
+        # OpenAI-compatible endpoints can be asked for bare JSON instead of fenced text
+        if self._json_mode:
+            data["response_format"] = {"type": "json_object"}
+
+        result = content_str = None
         try:
-            response = requests.post(
-                self.llm_config.get("endpoint"),
-                headers=self.headers,
-                json=data
-            )
-            response.raise_for_status()
-            result = response.json()
+            result = await self._post_with_retry(data, self._request_timeout(max_tokens))
 
             # Handle different response structures
             if 'content' in result and len(result['content']) > 0:
@@ -470,51 +797,87 @@ DEVOPS ANALYSIS FACTORS:
             else:
                 raise RuntimeError(f"Unexpected response structure: {result}")
 
-            # Clean up the JSON response
-            content_str = content_str.strip()
+            # Prefer JSON inside a code block, else the outermost {...} span of the response
+            match = _FENCED_JSON_RE.search(content_str) or _BARE_JSON_RE.search(content_str)
+            if match:
+                return orjson.loads(match.group(1))
+            else:
+                debug_hint = self._save_debug_response(f"Full response:\n{result}\n\nExtracted content:\n{content_str}")
+                raise RuntimeError(f"Could not find valid JSON in response.{debug_hint}")
 
-            # Handle JSON wrapped in code blocks
-            if "```json" in content_str:
-                content_str = content_str.split("```json")[1].split("```")[0]
-            elif "```" in content_str:
-                content_str = content_str.split("```")[1].split("```")[0]
+        except httpx.HTTPError as e:
+            raise RuntimeError(f"Error calling LLM API: {e}")
+        except (orjson.JSONDecodeError, KeyError) as e:
+            debug_hint = self._save_debug_response(
+                f"Full response:\n{result}\n\nExtracted content:\n{content_str}\n\nError: {e}"
+            )
+            raise RuntimeError(f"Error parsing LLM response: {e}{debug_hint}")
 
-            # Remove any leading/trailing whitespace and newlines
-            content_str = content_str.strip()
+    def _save_debug_response(self, details: str) -> str:
+        """Save an unparseable LLM response for inspection when llm.debug is enabled
 
-            # Find JSON object boundaries
-            if content_str.startswith('{') and content_str.endswith('}'):
-                return json.loads(content_str)
-            else:
-                # Try to extract JSON from the response
-                start_idx = content_str.find('{')
-                end_idx = content_str.rfind('}') + 1
-                if start_idx != -1 and end_idx != -1:
-                    json_str = content_str[start_idx:end_idx]
-                    return json.loads(json_str)
-                else:
-                    # Debug: save response to file for inspection
-                    with open('debug_response.txt', 'w', encoding='utf-8') as f:
-                        f.write(f"Full response:\n{result}\n\nExtracted content:\n{content_str}")
-                    raise RuntimeError(f"Could not find valid JSON in response. Debug info saved to debug_response.txt")
+        Returns a suffix for the error message naming the file, or an empty string.
+        """
+        if not self._debug:
+            return ""
 
-        except requests.exceptions.RequestException as e:
-            raise RuntimeError(f"Error calling LLM API: {e}")
-        except (json.JSONDecodeError, KeyError) as e:
-            # Debug: save response to file for inspection
+        # Per-process file so concurrent runs don't overwrite each other
+        debug_file = f"debug_response_{os.getpid()}.txt"
+        try:
+            with open(debug_file, 'w', encoding='utf-8') as f:
+                f.write(details)
+        except OSError:
+            return ""
+        return f"\nResponse content saved to {debug_file}"
+
+    def _request_timeout(self, max_tokens: int) -> httpx.Timeout:
+        """Per-request timeout whose read budget grows with the requested output tokens"""
+
+        # The API sends nothing until generation finishes, so a batched call asking for
+        # several platforms' worth of tokens needs proportionally longer to respond
+        scale = max(1.0, max_tokens / _ANALYZE_MAX_TOKENS)
+        return httpx.Timeout(min(self._read_timeout * scale, self._batch_timeout), connect=5.0)
+
+    async def _post_with_retry(self, data: dict, timeout: httpx.Timeout) -> dict:
+        """POST to the LLM endpoint, retrying transient failures with exponential backoff"""
+
+        max_attempts = self._max_attempts
+
+        for attempt in range(1, max_attempts + 1):
             try:
-                with open('debug_response.txt', 'w', encoding='utf-8') as f:
-                    f.write(f"Full response:\n{result}\n\nExtracted content:\n{content_str}\n\nError: {e}")
-            except:
-                pass
-            raise RuntimeError(f"Error parsing LLM response: {e}\nResponse content saved to debug_response.txt")
+                async with self._llm_semaphore:
+                    response = await self._http_client.post(self._endpoint, content=orjson.dumps(data), timeout=timeout)
+                response.raise_for_status()
+                return orjson.loads(response.content)
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                # A read timeout means the generation outran its budget; repeating the
+                # identical request would just rerun the same long generation
+                retryable = (
+                    (isinstance(e, httpx.TransportError) and not isinstance(e, httpx.ReadTimeout))
+                    or (isinstance(e, httpx.HTTPStatusError) and e.response.status_code in _RETRYABLE_STATUS_CODES)
+                )
+                if not retryable or attempt == max_attempts:
+                    raise
+
+                # 1s, 2s, 4s... capped at 8s, plus jitter so parallel calls don't retry in lockstep
+                delay = min(2 ** (attempt - 1), 8) + random.uniform(0, 1)
+
+                # A rate-limited provider may say how long to wait; prefer that over guessing
+                if isinstance(e, httpx.HTTPStatusError):
+                    retry_after = e.response.headers.get("Retry-After", "")
+                    if retry_after.isdigit():
+                        delay = min(int(retry_after), _MAX_RETRY_AFTER) + random.uniform(0, 1)
+                logger.warning("LLM request failed (%s), retrying in %.1fs (attempt %d/%d)",
+                               e, delay, attempt, max_attempts)
+                await asyncio.sleep(delay)
 
     async def _calculate_story_points(self, platform_analyses: Dict[str, PlatformAnalysis],
                                    platform_detection: PlatformDetection,
                                    code_analysis: EnhancedCodeAnalysis = None,
                                    code_dir: Path = None,
                                    doc_summary: str = "",
-                                   impact_scopes: Dict[str, ImpactScope] = None) -> Dict[str, int]:
+                                   impact_scopes: Dict[str, ImpactScope] = None,
+                                   context_data: Optional[dict] = None) -> StoryPointBreakdown:
         """
         Calculate story points using the Enhanced Formula from Gemini discussion:
 
@@ -534,6 +897,8 @@ DEVOPS ANALYSIS FACTORS:
         platform_story_points = {}
         platform_scores = {}
         platform_impact_tiers = {}
+        # Diagnostics are only formatted when debug logging is on
+        verbose = logger.isEnabledFor(logging.DEBUG)
 
         # Step 1: Calculate base platform scores (unchanged - this is the AI complexity assessment)
         for platform, analysis in platform_analyses.items():
@@ -569,15 +934,16 @@ DEVOPS ANALYSIS FACTORS:
 
                     platform_impact_tiers[platform] = impact_tier
 
-                    # Print impact info
-                    print(f"\n[Impact Analysis: {platform.upper()}]")
-                    print(f"  Extracted entities: {', '.join(impact.extracted_entities[:5])}")
-                    print(f"  Directly affected files: {len(impact.directly_affected_files)}")
-                    print(f"  Cascading changes: {len(impact.cascading_affected_files)}")
-                    print(f"  Total affected: {impact.total_affected_files} / {impact.total_files_in_platform} "
-                          f"({impact_ratio:.1%})")
-                    print(f"  Impact Tier: {impact_tier} → {impact_tax:.1f}× integration tax")
-                    print(f"  Confidence: {impact.confidence:.2f}")
+                    # Log impact info
+                    if verbose:
+                        logger.debug("\n[Impact Analysis: %s]", platform.upper())
+                        logger.debug("  Extracted entities: %s", ', '.join(impact.extracted_entities[:5]))
+                        logger.debug("  Directly affected files: %d", len(impact.directly_affected_files))
+                        logger.debug("  Cascading changes: %d", len(impact.cascading_affected_files))
+                        logger.debug("  Total affected: %d / %d (%.1f%%)", impact.total_affected_files,
+                                     impact.total_files_in_platform, impact_ratio * 100)
+                        logger.debug("  Impact Tier: %s → %.1f× integration tax", impact_tier, impact_tax)
+                        logger.debug("  Confidence: %.2f", impact.confidence)
                 else:
                     # No impact analysis available, assume full platform impact
                     impact_tax = 1.5
@@ -586,11 +952,15 @@ DEVOPS ANALYSIS FACTORS:
 
                 # Apply impact tax to get adjusted score
                 adjusted_score = platform_score * impact_tax
+                if verbose:
+                    logger.debug("  %s score (base → after impact tax): %.2f → %.2f (%s, %.1f×)",
+                                 platform, platform_score, adjusted_score, impact_tier, impact_tax)
                 platform_sp = self._map_score_to_story_points(int(adjusted_score))
                 platform_story_points[platform] = platform_sp
 
         # Auto-detect context from codebase and requirements
-        context_data = auto_detect_context(code_dir, doc_summary) if code_dir else {}
+        if context_data is None:
+            context_data = await self._detect_context(code_dir, doc_summary)
         risk_multiplier = context_data.get("risk_multiplier", 1.0)
         legacy_status = context_data.get("legacy_status", "greenfield")
         traffic_volume = context_data.get("traffic_volume", "no_traffic")
@@ -614,30 +984,24 @@ DEVOPS ANALYSIS FACTORS:
         # Step 4: Map to Fibonacci
         overall_sp = self._map_score_to_story_points(int(final_score))
 
-        # Print calculation information for transparency
-        print(f"\n[Enhanced Calculation]")
-        print(f"  Platform scores (base → after impact tax):")
-        for platform, base_score in platform_scores.items():
-            if platform in platform_impact_tiers:
-                tier = platform_impact_tiers[platform]
-                tax = 1.0 if "LOCAL" in tier else (1.2 if "MODULE" in tier else (1.5 if "SYSTEM" in tier else 2.0))
-                adjusted = base_score * tax
-                print(f"    {platform}: {base_score:.2f} → {adjusted:.2f} ({tier}, {tax:.1f}×)")
-        print(f"  Base sum: {base_sum:.2f}")
-        print(f"  Integration multiplier: {integration_multiplier:.2f} "
-              f"(platforms={platform_count}, legacy={legacy_status}, traffic={traffic_volume})")
-        print(f"  Risk multiplier: {risk_multiplier:.2f}")
-        print(f"  Final score: {final_score:.2f} -> {overall_sp} story points")
-
-        return {
-            "by_platform": platform_story_points,
-            "overall": overall_sp,
-            "base_sum": base_sum,
-            "integration_multiplier": integration_multiplier,
-            "risk_multiplier": risk_multiplier,
-            "final_score": final_score,
-            "platform_impact_tiers": platform_impact_tiers
-        }
+        # Log calculation information for transparency
+        if verbose:
+            logger.debug("\n[Enhanced Calculation]")
+            logger.debug("  Base sum: %.2f", base_sum)
+            logger.debug("  Integration multiplier: %.2f (platforms=%d, legacy=%s, traffic=%s)",
+                         integration_multiplier, platform_count, legacy_status, traffic_volume)
+            logger.debug("  Risk multiplier: %.2f", risk_multiplier)
+            logger.debug("  Final score: %.2f -> %d story points", final_score, overall_sp)
+
+        return StoryPointBreakdown(
+            by_platform=platform_story_points,
+            overall=overall_sp,
+            base_sum=base_sum,
+            integration_multiplier=integration_multiplier,
+            risk_multiplier=risk_multiplier,
+            final_score=final_score,
+            platform_impact_tiers=platform_impact_tiers
+        )
 
     def _calculate_integration_overhead(self, platform_count: int,
                                        legacy_status: str,
@@ -649,39 +1013,15 @@ DEVOPS ANALYSIS FACTORS:
         2. Integration Complexity: Legacy status and traffic volume
         """
 
-        # Base multiplier: 1.0 (no overhead)
-        context_switching_multiplier = 1.0
-        integration_complexity_multiplier = 1.0
-
-        # Context switching cost (0-50% overhead based on platform count)
-        if platform_count >= 4:
-            context_switching_multiplier = 1.5
-        elif platform_count == 3:
-            context_switching_multiplier = 1.3
-        elif platform_count == 2:
-            context_switching_multiplier = 1.15
-        else:
-            context_switching_multiplier = 1.0
-
-        # Integration complexity based on legacy status
-        legacy_multiplier = {
-            "greenfield": 1.0,
-            "low_legacy": 1.05,
-            "moderate_legacy": 1.15,
-            "high_legacy": 1.25,
-            "critical_legacy": 1.4
-        }.get(legacy_status, 1.0)
-
-        # Integration complexity based on traffic volume
-        traffic_multiplier = {
-            "no_traffic": 1.0,
-            "low_traffic": 1.02,
-            "medium_traffic": 1.08,
-            "high_traffic": 1.15,
-            "critical_traffic": 1.25
-        }.get(traffic_volume, 1.0)
-
-        integration_complexity_multiplier = legacy_multiplier * traffic_multiplier
+        # Context switching cost (0-50% overhead based on platform count, capped at 4+)
+        context_switching_multiplier = _CONTEXT_SWITCHING_MULTIPLIERS[
+            min(platform_count, len(_CONTEXT_SWITCHING_MULTIPLIERS) - 1)
+        ]
+
+        # Integration complexity based on legacy status and traffic volume
+        integration_complexity_multiplier = (
+            _LEGACY_MULTIPLIERS.get(legacy_status, 1.0) * _TRAFFIC_MULTIPLIERS.get(traffic_volume, 1.0)
+        )
 
         # Combined multiplier
         return context_switching_multiplier * integration_complexity_multiplier
@@ -689,20 +1029,21 @@ DEVOPS ANALYSIS FACTORS:
     def _map_score_to_story_points(self, score: int) -> int:
         """Map complexity score to Fibonacci story points"""
 
-        mapping = self.config_data.get("platform_mapping", {})
-
-        if score <= mapping.get("sp1_max", 5):
-            return 1
-        elif score <= mapping.get("sp2_max", 8):
-            return 2
-        elif score <= mapping.get("sp3_max", 12):
-            return 3
-        elif score <= mapping.get("sp5_max", 16):
-            return 5
-        elif score <= mapping.get("sp8_max", 20):
-            return 8
-        else:
-            return 13
+        if 0 <= score < len(self._sp_lut):
+            return self._sp_lut[score]
+        return self._scan_sp_edges(score)
+
+    def _scan_sp_edges(self, score: int) -> int:
+        """Bisect the ascending story point bin edges for scores outside the lookup table"""
+
+        return self._sp_values[bisect.bisect_left(self._sp_thresholds, score)]
+
+    async def _detect_context(self, code_dir: Optional[Path], doc_summary: str) -> dict:
+        """Auto-detect codebase context in a worker thread (empty without a code directory)"""
+
+        if not code_dir:
+            return {}
+        return await asyncio.to_thread(auto_detect_context, code_dir, doc_summary)
 
     def get_context_summary(self, code_dir: Path, doc_summary: str) -> dict:
         """
@@ -1,39 +1,117 @@
-import json
-import os
+import copy
+import orjson
+import hashlib
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
 from typing import Dict, List, Optional
 import re
 from .learning_system import LearningSystem
 
+# Maximum detection results kept per detector
+_DETECTION_CACHE_SIZE = 256
+
+def doc_digest(text: str) -> bytes:
+    """16-byte BLAKE2b digest used to key per-document caches"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+# Application context file, resolved once at import
+_CONTEXT_PATH = Path(__file__).resolve().parent.parent.parent / "application_context.json"
+
+# Default context if the file doesn't exist (read-only; detectors get their own copy)
+_DEFAULT_CONTEXT = MappingProxyType({
+    "applications": MappingProxyType({}),
+    "platform_patterns": MappingProxyType({
+        "mobile_indicators": ("mobile app", "android", "ios", "flutter", "react native"),
+        "web_indicators": ("web application", "browser", "html", "javascript"),
+        "desktop_indicators": ("desktop", "windows application", "electron")
+    })
+})
+
+# Raw application context file contents, keyed by (path, mtime_ns); each detector
+# parses its own copy so none can corrupt another's context
+_context_cache: Dict[tuple, bytes] = {}
+
+@lru_cache(maxsize=128, typed=True)
+def _format_context_addition(reasoning: str, detected_platforms: tuple, confidence: float) -> str:
+    """Render the application context block appended to AI prompts"""
+    return f"""
+
+APPLICATION CONTEXT:
+{reasoning}
+
+Based on the document analysis:
+- Likely platforms: {', '.join(detected_platforms)}
+- Confidence: {confidence}
+
+IMPORTANT: When determining platforms, prioritize this context over generic assumptions.
+- If a known application is mentioned, use its documented platform.
+- Don't default to web/frontend just because UI changes are mentioned.
+- Consider the full context of the work item.
+
+"""
+
 class PlatformDetector:
     """Smart platform detection with application context"""
 
     def __init__(self):
-        self.context_file = os.path.join(os.path.dirname(__file__), "../../application_context.json")
+        self.context_file = _CONTEXT_PATH
         self.context = self._load_context()
+        # Known application names lowercased once, in config order
+        self._applications = tuple(
+            (app_name.lower(), app_name, app_info)
+            for app_name, app_info in self.context.get("applications", {}).items()
+        )
+        # Every distinct platform indicator, checked once per document
+        self._indicators = frozenset(
+            indicator
+            for category in self.context.get("platform_patterns", {}).values()
+            for indicator in category
+        )
         self.learning_system = LearningSystem()
+        self._detection_cache: OrderedDict[tuple, dict] = OrderedDict()
 
     def _load_context(self) -> dict:
-        """Load application context from JSON file"""
-        try:
-            with open(self.context_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            # Default context if file doesn't exist
+        """Load application context from JSON file (read once per file version)"""
+        context_file = Path(self.context_file)
+        if not context_file.is_file():
             return {
                 "applications": {},
-                "platform_patterns": {
-                    "mobile_indicators": ["mobile app", "android", "ios", "flutter", "react native"],
-                    "web_indicators": ["web application", "browser", "html", "javascript"],
-                    "desktop_indicators": ["desktop", "windows application", "electron"]
-                }
+                "platform_patterns": dict(_DEFAULT_CONTEXT["platform_patterns"])
             }
 
-    def detect_platform_from_context(self, doc_text: str) -> Dict[str, any]:
+        cache_key = (context_file, context_file.stat().st_mtime_ns)
+        raw = _context_cache.get(cache_key)
+        if raw is None:
+            raw = _context_cache[cache_key] = context_file.read_bytes()
+        return orjson.loads(raw)
+
+    def detect_platform_from_context(self, doc_text: str, doc_lower: Optional[str] = None,
+                                     digest: Optional[bytes] = None) -> Dict[str, any]:
         """Detect platforms based on document text and known application context"""
-        doc_lower = doc_text.lower()
+        # Keyed on the learned-pattern version too, so recorded corrections take effect;
+        # callers that already hold doc_digest(doc_text) can pass it to skip rehashing
+        cache_key = (digest or doc_digest(doc_text), self.learning_system.version)
+        result = self._detection_cache.get(cache_key)
+        if result is None:
+            result = self._detection_cache[cache_key] = self._detect_platform(doc_text, doc_lower)
+            if len(self._detection_cache) > _DETECTION_CACHE_SIZE:
+                self._detection_cache.popitem(last=False)
+        else:
+            self._detection_cache.move_to_end(cache_key)
+
+        # Callers get their own copy so they can't corrupt the cached result
+        return copy.deepcopy(result)
+
+    def _detect_platform(self, doc_text: str, doc_lower: Optional[str] = None) -> Dict[str, any]:
+        """Run platform detection for a document without consulting the cache"""
+        # Lowercase once (unless the caller already did) and share it with the learning system
+        if doc_lower is None:
+            doc_lower = doc_text.lower()
 
         # First check learned patterns (higher priority as they're based on corrections)
-        learned_result = self.learning_system.get_improved_detection(doc_text)
+        learned_result = self.learning_system.get_improved_detection(doc_text, doc_lower)
         if learned_result and learned_result.get("confidence", 0) > 0.7:
             return {
                 "detected_platforms": learned_result["platforms"],
@@ -44,17 +122,18 @@ class PlatformDetector:
             }
 
         # Then check for known applications from config
-        for app_name, app_info in self.context.get("applications", {}).items():
-            if app_name.lower() in doc_lower:
+        app_patterns = self.learning_system.patterns.get("application_patterns", {})
+        for app_lower, app_name, app_info in self._applications:
+            if app_lower in doc_lower:
                 # Check if we have learned corrections for this app
-                app_patterns = self.learning_system.patterns.get("application_patterns", {})
-                if app_name in app_patterns:
-                    learned_platforms = app_patterns[app_name]["platforms"]
-                    learned_confidence = app_patterns[app_name]["confidence"]
+                learned_app = app_patterns.get(app_name)
+                if learned_app is not None:
+                    learned_platforms = learned_app["platforms"]
+                    learned_confidence = learned_app["confidence"]
                     return {
                         "detected_platforms": learned_platforms,
                         "confidence": learned_confidence,
-                        "reasoning": f"Learned from {app_patterns[app_name]['correction_count']} corrections that '{app_name}' uses: {', '.join(learned_platforms)}",
+                        "reasoning": f"Learned from {learned_app['correction_count']} corrections that '{app_name}' uses: {', '.join(learned_platforms)}",
                         "application_match": app_name,
                         "source": "learned_application"
                     }
@@ -68,11 +147,13 @@ class PlatformDetector:
                     }
 
         # If no known app found, use pattern matching
+        found = {indicator for indicator in self._indicators if indicator in doc_lower}
+        web_score = self._count_indicators(found, "web_indicators")
         platform_scores = {
-            "mobile": self._count_indicators(doc_lower, "mobile_indicators"),
-            "frontend": self._count_indicators(doc_lower, "web_indicators"),
-            "backend": self._count_indicators(doc_lower, "web_indicators") * 0.8,  # Backend often implied
-            "desktop": self._count_indicators(doc_lower, "desktop_indicators")
+            "mobile": self._count_indicators(found, "mobile_indicators"),
+            "frontend": web_score,
+            "backend": web_score * 0.8,  # Backend often implied
+            "desktop": self._count_indicators(found, "desktop_indicators")
         }
 
         # Apply heuristics
@@ -103,33 +184,21 @@ class PlatformDetector:
             "platform_scores": platform_scores
         }
 
-    def _count_indicators(self, text: str, indicator_type: str) -> float:
-        """Count how many platform indicators appear in text"""
+    def _count_indicators(self, found: set, indicator_type: str) -> float:
+        """Count how many platform indicators of a type were found in the text"""
         indicators = self.context.get("platform_patterns", {}).get(indicator_type, [])
-        count = 0
-        for indicator in indicators:
-            if indicator in text:
-                count += 1
-        return count / len(indicators) if indicators else 0
+        if not indicators:
+            return 0
+        if not found:
+            return 0.0
+        return sum(indicator in found for indicator in indicators) / len(indicators)
 
     def enhance_ai_prompt(self, base_prompt: str, doc_text: str) -> str:
         """Enhance AI prompt with application context"""
         context_info = self.detect_platform_from_context(doc_text)
 
-        context_addition = f"""
-
-APPLICATION CONTEXT:
-{context_info['reasoning']}
-
-Based on the document analysis:
-- Likely platforms: {', '.join(context_info['detected_platforms'])}
-- Confidence: {context_info['confidence']}
-
-IMPORTANT: When determining platforms, prioritize this context over generic assumptions.
-- If a known application is mentioned, use its documented platform.
-- Don't default to web/frontend just because UI changes are mentioned.
-- Consider the full context of the work item.
-
-"""
-
-        return base_prompt + context_addition
\ No newline at end of file
+        return base_prompt + _format_context_addition(
+            context_info['reasoning'],
+            tuple(context_info['detected_platforms']),
+            context_info['confidence']
+        )
@@ -1,4 +1,6 @@
-from typing import Dict, List
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+import numpy as np
 from story_size.core.models import Factors
 
 def calculate_complexity_score(factors: Factors, weights: Dict[str, int]) -> int:
@@ -13,22 +15,45 @@ def calculate_complexity_score(factors: Factors, weights: Dict[str, int]) -> int
         weights.get("NR", 1) * factors.nr
     )
 
-def map_to_story_points(score: int, mapping: Dict[str, int]) -> int:
+# Story point ladder: a score maps to the first bucket whose threshold it does not exceed
+_STORY_POINT_VALUES = (1, 2, 3, 5, 8, 13)
+_THRESHOLD_KEYS = (("sp1_max", 7), ("sp2_max", 10), ("sp3_max", 13), ("sp5_max", 16), ("sp8_max", 20))
+_DEFAULT_THRESHOLDS = tuple(default for _, default in _THRESHOLD_KEYS)
+
+def story_point_thresholds(mapping: Dict[str, int]) -> Tuple[int, ...]:
+    """
+    Resolves the ascending story point thresholds from a mapping config,
+    so callers scoring many items can compute them once.
+    """
+    return tuple(mapping.get(key, default) for key, default in _THRESHOLD_KEYS)
+
+def map_to_story_points(score: int, mapping: Optional[Dict[str, int]] = None,
+                        thresholds: Optional[Tuple[int, ...]] = None) -> int:
     """
     Maps the complexity score to story points.
     """
-    if score <= mapping.get("sp1_max", 7):
-        return 1
-    elif score <= mapping.get("sp2_max", 10):
-        return 2
-    elif score <= mapping.get("sp3_max", 13):
-        return 3
-    elif score <= mapping.get("sp5_max", 16):
-        return 5
-    elif score <= mapping.get("sp8_max", 20):
-        return 8
-    else:
-        return 13
+    if thresholds is None:
+        thresholds = _DEFAULT_THRESHOLDS if mapping is None else story_point_thresholds(mapping)
+    return _STORY_POINT_VALUES[bisect_left(thresholds, score)]
+
+def score_many(factors_list: List[Factors], weights: Dict[str, int],
+               mapping: Optional[Dict[str, int]] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calculates complexity scores and story points for a batch of items at once.
+    Returns (scores, story_points) arrays in the order of factors_list.
+    """
+    weight_vector = np.array([weights.get(key, 1) for key in ("DC", "IC", "IB", "DS", "NR")])
+    factor_matrix = np.fromiter(
+        (value for f in factors_list for value in (f.dc, f.ic, f.ib, f.ds, f.nr)),
+        dtype=np.int64,
+        count=len(factors_list) * 5
+    ).reshape(-1, 5)
+    scores = factor_matrix @ weight_vector
+
+    thresholds = _DEFAULT_THRESHOLDS if mapping is None else story_point_thresholds(mapping)
+    # side="left" matches bisect_left in map_to_story_points: a score equal to a threshold stays in that bucket
+    story_points = np.asarray(_STORY_POINT_VALUES)[np.searchsorted(thresholds, scores, side="left")]
+    return scores, story_points
 
 def get_confidence(factors: Factors) -> float:
     """
@@ -36,6 +61,10 @@ def get_confidence(factors: Factors) -> float:
     This is a simple implementation and can be improved.
     """
     # Simple confidence calculation: closer to the average, higher the confidence
-    avg_factor = (factors.dc + factors.ic + factors.ib + factors.ds + factors.nr) / 5.0
-    variance = sum([(x - avg_factor) ** 2 for x in [factors.dc, factors.ic, factors.ib, factors.ds, factors.nr]]) / 5.0
+    dc, ic, ib, ds, nr = factors.dc, factors.ic, factors.ib, factors.ds, factors.nr
+    avg_factor = (dc + ic + ib + ds + nr) / 5.0
+    variance = (
+        (dc - avg_factor) ** 2 + (ic - avg_factor) ** 2 + (ib - avg_factor) ** 2 +
+        (ds - avg_factor) ** 2 + (nr - avg_factor) ** 2
+    ) / 5.0
     return 1.0 - (variance / 4.0) # Normalize to a 0-1 range, assuming max variance is 4 (for 1-5 range)
@@ -0,0 +1,26 @@
+import logging
+import sys
+
+# Logger whose records replace the pipeline's former print() progress output
+_PIPELINE_LOGGER = "story_size.core.platform_ai_client"
+
+def setup_logging(level: int = logging.INFO) -> None:
+    """
+    Configure console logging for the analysis pipeline.
+
+    Progress messages from the analysis pipeline are emitted through the
+    platform AI client's logger; this routes them to stdout with the same
+    plain formatting the CLI uses for its own output. Other story_size
+    loggers are left alone, so they keep Python's default behaviour
+    (warnings and above on stderr).
+
+    Args:
+        level: Minimum level to emit (records below it are never formatted)
+    """
+    logger = logging.getLogger(_PIPELINE_LOGGER)
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.propagate = False
+    logger.setLevel(level)